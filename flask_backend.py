@@ -5,25 +5,120 @@ This file provides the API endpoints that connect to your existing Python module
 Place this file in your uav_deconfliction/ directory and run it.
 """
 
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, stream_with_context
 from flask_cors import CORS
 import json
+import hashlib
+import threading
+import itertools
+import atexit
 import os
+import shutil
+import tempfile
 import sys
+import uuid
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-import tempfile
 import math
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
+import orjson
+import numpy as np
 import plotly.graph_objects as go
 import plotly.io as pio
-from functools import lru_cache
+from collections import OrderedDict, deque
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; check_mission falls back to NumPy
+    njit = None
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # scipy is optional; large checks fall back to _check_pairs
+    cKDTree = None
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend communication
 
-# Store simulation results in memory (use database in production)
-simulation_results = []
+def _json_default(obj):
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def json_bytes(obj):
+    """Encode with orjson, falling back to stdlib json for values it rejects (e.g. ints beyond 64 bits)."""
+    try:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC)
+    except orjson.JSONEncodeError:
+        return json.dumps(obj, default=_json_default).encode()
+
+def ojsonify(obj, status=200):
+    """orjson-backed replacement for flask.jsonify; NumPy arrays and scalars serialize directly."""
+    return Response(json_bytes(obj), status=status, mimetype='application/json')
+
+# Store recent simulation results in memory (use database in production).
+# Older entries are spilled as JSON to a scratch directory private to this process.
+MAX_SIMULATIONS_IN_MEMORY = int(os.environ.get('UAV_MAX_SIMULATIONS', '256'))
+if MAX_SIMULATIONS_IN_MEMORY < 1:
+    raise ValueError(f"UAV_MAX_SIMULATIONS must be at least 1, got {MAX_SIMULATIONS_IN_MEMORY}")
+
+simulation_results = deque(maxlen=MAX_SIMULATIONS_IN_MEMORY)
+_sim_by_id = {}  # id -> entry in simulation_results
+_plot_4d_html = {}  # id -> rendered create_4d_plot page; simulations never change once stored
+_sim_etags = {}  # id -> content hash served as the ETag of /api/simulation/<id>
+_sim_ids = itertools.count(1)
+_results_lock = threading.Lock()
+_spill_root = os.environ.get('UAV_SPILL_DIR') or None  # parent of the scratch dir, default system temp
+_spill_dir = None  # created on first eviction, removed at exit
+
+def _spill_simulation(sim):
+    """Write an evicted simulation to the spill directory atomically."""
+    global _spill_dir
+    if _spill_dir is None:
+        if _spill_root is not None:
+            os.makedirs(_spill_root, exist_ok=True)
+        _spill_dir = tempfile.mkdtemp(prefix='uav_simulations_', dir=_spill_root)
+        atexit.register(shutil.rmtree, _spill_dir, ignore_errors=True)
+    fd, tmp_path = tempfile.mkstemp(dir=_spill_dir, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(json_bytes(sim))
+        os.replace(tmp_path, os.path.join(_spill_dir, f"{sim['id']}.json"))
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def simulation_etag(sim):
+    """Short content hash of a stored simulation."""
+    return hashlib.blake2b(json_bytes(sim), digest_size=8).hexdigest()
+
+def store_simulation(sim):
+    """Keep sim in memory, spilling the oldest entry to disk once the cap is reached."""
+    with _results_lock:
+        if len(simulation_results) == simulation_results.maxlen:
+            # append() below drops the oldest entry; spill and unindex it first
+            evicted = simulation_results[0]
+            _spill_simulation(evicted)
+            del _sim_by_id[evicted["id"]]
+            _plot_4d_html.pop(evicted["id"], None)
+            _sim_etags.pop(evicted["id"], None)
+        simulation_results.append(sim)
+        _sim_by_id[sim["id"]] = sim
+        _sim_etags[sim["id"]] = simulation_etag(sim)
+
+def get_simulation(simulation_id):
+    """Look a simulation up in memory, then among the spilled ones; None if unknown."""
+    sim = _sim_by_id.get(simulation_id)
+    if sim is not None or _spill_dir is None or not simulation_id.isdigit():
+        return sim
+    try:
+        with open(os.path.join(_spill_dir, f"{simulation_id}.json"), 'rb') as f:
+            # stdlib json keeps integers beyond 64 bits exact; orjson would turn them into floats
+            return json.loads(f.read())
+    except FileNotFoundError:
+        return None
 
 # Your Python utility functions
 def euclidean_distance(p1, p2):
@@ -44,126 +139,225 @@ def parse_iso_time(ts):
     """Parse ISO 8601 time strings into datetime objects."""
     return datetime.fromisoformat(ts)
 
-def check_mission(primary_mission, simulated_flights, distance_threshold=20):
-    conflicts = []
+_EPOCH = datetime(1970, 1, 1)
+
+def _epoch_seconds(dt):
+    """Seconds since the Unix epoch; naive datetimes are treated as UTC so deltas match datetime subtraction."""
+    if dt.tzinfo is None:
+        return (dt - _EPOCH).total_seconds()
+    return dt.timestamp()
+
+# ISO string -> epoch seconds, shared across requests; cleared when it grows past the cap
+_TS_CACHE_SIZE = 100_000
+_ts_cache = {}
+
+def ts(tstr):
+    """Epoch seconds for an ISO 8601 string, memoized in a plain dict."""
+    v = _ts_cache.get(tstr)
+    if v is None:
+        if len(_ts_cache) >= _TS_CACHE_SIZE:
+            _ts_cache.clear()
+        v = _ts_cache[tstr] = _epoch_seconds(parse_iso_time(tstr))
+    return v
+
+def _to_arrays(waypoints):
+    """Convert a waypoint list into SoA float64 arrays (x, y, z, t in epoch seconds)."""
+    x = np.asarray([wp['x'] for wp in waypoints], dtype=np.float64)
+    y = np.asarray([wp['y'] for wp in waypoints], dtype=np.float64)
+    z = np.asarray([wp['z'] for wp in waypoints], dtype=np.float64)
+    t = np.fromiter((ts(wp['time']) for wp in waypoints), dtype=np.float64, count=len(waypoints))
+    return x, y, z, t
+
+def _check_pairs_numpy(px, py, pt, dx, dy, dt, thr2, tol):
+    """Return (primary, drone) waypoint index arrays for pairs within thr2 (squared) and tol seconds."""
+    diff_x = px[:, None] - dx[None, :]
+    diff_y = py[:, None] - dy[None, :]
+    d2 = diff_x * diff_x + diff_y * diff_y
+    delta_t = np.abs(pt[:, None] - dt[None, :])
+    return np.nonzero((delta_t <= tol) & (d2 < thr2))
+
+if njit is not None:
+    @njit(cache=True, parallel=True, fastmath=True)
+    def _check_pairs_windowed(px, py, pt, dx, dy, dt, lo, hi, thr2, tol):
+        """Count-then-fill pair scan; primary waypoint i only visits drone waypoints lo[i]:hi[i]."""
+        n_p = px.shape[0]
+
+        # First pass: count matches per primary waypoint
+        counts = np.zeros(n_p, dtype=np.int64)
+        for i in prange(n_p):
+            c = 0
+            for j in range(lo[i], hi[i]):
+                ddx = px[i] - dx[j]
+                ddy = py[i] - dy[j]
+                if abs(pt[i] - dt[j]) <= tol and ddx * ddx + ddy * ddy < thr2:
+                    c += 1
+            counts[i] = c
+
+        # Second pass: each row writes into its own slice of the output buffers
+        offsets = np.zeros(n_p + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(counts)
+        out_p = np.empty(offsets[n_p], dtype=np.int64)
+        out_w = np.empty(offsets[n_p], dtype=np.int64)
+        for i in prange(n_p):
+            k = offsets[i]
+            for j in range(lo[i], hi[i]):
+                ddx = px[i] - dx[j]
+                ddy = py[i] - dy[j]
+                if abs(pt[i] - dt[j]) <= tol and ddx * ddx + ddy * ddy < thr2:
+                    out_p[k] = i
+                    out_w[k] = j
+                    k += 1
+        return out_p, out_w
+
+    def _check_pairs(px, py, pt, dx, dy, dt, thr2, tol):
+        """Streaming version of _check_pairs_numpy that never builds the N x M matrices."""
+        # Specialize the scan to this request's tolerance: with the drone sorted by
+        # time, each primary waypoint's candidates are one contiguous index window.
+        # The window is padded slightly; the kernel still applies the exact test.
+        order = np.argsort(dt, kind='stable')
+        dt_sorted = dt[order]
+        pad = tol + 1e-3
+        lo = np.searchsorted(dt_sorted, pt - pad, side='left')
+        hi = np.searchsorted(dt_sorted, pt + pad, side='right')
+        idx_p, idx_w = _check_pairs_windowed(px, py, pt, dx[order], dy[order], dt_sorted, lo, hi, thr2, tol)
+        return idx_p, order[idx_w]
+else:
+    _check_pairs = _check_pairs_numpy
+
+def _query_pairs(tree, pt, dx, dy, dt, threshold, tol):
+    """KD-tree version of _check_pairs: only candidates within `threshold` of a primary waypoint are tested."""
+    candidates = tree.query_ball_point(np.column_stack((dx, dy)), r=threshold)
+    counts = np.fromiter((len(c) for c in candidates), dtype=np.int64, count=len(candidates))
+    idx_w = np.repeat(np.arange(len(candidates)), counts)
+    idx_p = np.fromiter(itertools.chain.from_iterable(candidates), dtype=np.int64, count=int(counts.sum()))
+
+    # query_ball_point is inclusive at r; keep the strict distance test and add the time test
+    diff_x = tree.data[idx_p, 0] - dx[idx_w]
+    diff_y = tree.data[idx_p, 1] - dy[idx_w]
+    keep = (np.abs(pt[idx_p] - dt[idx_w]) <= tol) & (diff_x * diff_x + diff_y * diff_y < threshold * threshold)
+    return idx_p[keep], idx_w[keep]
+
+# Without numba, drones with at least this many waypoint pairs get their
+# candidates from a KD-tree instead of the N x M NumPy matrices. The tree only
+# prunes on x/y, so it loses to the time-windowed Numba kernel whenever that is
+# available, especially for tracks that share airspace for a long time.
+_KDTREE_MIN_PAIRS = 250_000
+
+def check_mission(primary_mission, simulated_flights, distance_threshold=20, time_tolerance=1):
     primary_traj = primary_mission['waypoints']
-    
-    for p_wp in primary_traj:
-        p_time = parse_iso_time(p_wp['time'])
+    distance_threshold = float(distance_threshold)
+    time_tolerance = float(time_tolerance)
+    if not primary_traj or distance_threshold <= 0:
+        return "clear", []
+
+    px, py, _, pt = _to_arrays(primary_traj)
+    threshold_sq = distance_threshold * distance_threshold
+
+    # Primary (x, y, t) bounding box grown by the thresholds; nothing outside it can conflict
+    box_lo = np.array([px.min() - distance_threshold, py.min() - distance_threshold, pt.min() - time_tolerance])
+    box_hi = np.array([px.max() + distance_threshold, py.max() + distance_threshold, pt.max() + time_tolerance])
+    tree = None
+
+    # Matching (primary waypoint, drone, drone waypoint) index triples
+    hit_p, hit_d, hit_w = [], [], []
+    for d_idx, drone in enumerate(simulated_flights):
+        dx, dy, _, dt = _to_arrays(drone['waypoints'])
+        d_xyt = np.column_stack((dx, dy, dt))
+        inside = np.flatnonzero(np.all((d_xyt >= box_lo) & (d_xyt <= box_hi), axis=1))
+        if not len(inside):
+            continue
+        dx, dy, dt = dx[inside], dy[inside], dt[inside]
+
+        if njit is None and cKDTree is not None and len(px) * len(dx) >= _KDTREE_MIN_PAIRS:
+            if tree is None:
+                tree = cKDTree(np.column_stack((px, py)))
+            idx_p, idx_w = _query_pairs(tree, pt, dx, dy, dt, distance_threshold, time_tolerance)
+        else:
+            idx_p, idx_w = _check_pairs(px, py, pt, dx, dy, dt, threshold_sq, time_tolerance)
+        idx_w = inside[idx_w]
+        hit_p.append(idx_p)
+        hit_d.append(np.full(idx_p.shape, d_idx))
+        hit_w.append(idx_w)
+
+    conflicts = []
+    if hit_p:
+        hit_p = np.concatenate(hit_p)
+        hit_d = np.concatenate(hit_d)
+        hit_w = np.concatenate(hit_w)
+
+        # Same order as a nested walk: primary waypoint, then drone, then drone waypoint
+        order = np.lexsort((hit_w, hit_d, hit_p))
+        last_p = -1
         small_offset = 0
-        
-        for drone in simulated_flights:
-            drone_id = drone['id']
-            drone_traj = drone['waypoints']
-
-            for d_wp in drone_traj:
-                d_time = parse_iso_time(d_wp['time'])
-                
-                if is_temporal_overlap(p_time, d_time):
-                    if is_spatial_conflict(p_wp, d_wp, distance_threshold):
-                        small_offset += 1
-                        conflicts.append({
-                            'time': p_wp['time'],
-                            'location': {'x': p_wp['x'], 'y': p_wp['y'], 'z': p_wp['z'] + small_offset},
-                            'conflict_with': drone_id
-                        })
+        for k in order:
+            i = hit_p[k]
+            if i != last_p:
+                last_p = i
+                small_offset = 0
+            small_offset += 1
+            p_wp = primary_traj[i]
+            conflicts.append({
+                'time': p_wp['time'],
+                'location': {'x': p_wp['x'], 'y': p_wp['y'], 'z': p_wp['z'] + small_offset},
+                'conflict_with': simulated_flights[hit_d[k]]['id']
+            })
 
     if conflicts:
         return "conflict detected", conflicts
     else:
         return "clear", []
 
-@lru_cache
-def parse_time_cached(tstr):
-    return datetime.fromisoformat(tstr)
-
-def is_time_close(t1, t2, tol=0.5):
-    return abs((t1 - t2).total_seconds()) <= tol
+# check_mission results keyed by an input digest, oldest evicted first
+_CHECK_CACHE_SIZE = 128
+_check_cache = OrderedDict()
+_check_cache_lock = threading.Lock()
+
+def check_mission_cached(primary_mission, simulated_flights, distance_threshold=20, time_tolerance=1):
+    """check_mission with results memoized on a digest of the inputs."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(json_bytes(primary_mission))
+    h.update(json_bytes(simulated_flights))
+    h.update(f"{distance_threshold}|{time_tolerance}".encode())
+    key = h.hexdigest()
+
+    with _check_cache_lock:
+        cached = _check_cache.get(key)
+        if cached is not None:
+            _check_cache.move_to_end(key)
+            return cached
+
+    result = check_mission(primary_mission, simulated_flights, distance_threshold, time_tolerance)
+
+    with _check_cache_lock:
+        _check_cache[key] = result
+        _check_cache.move_to_end(key)
+        while len(_check_cache) > _CHECK_CACHE_SIZE:
+            _check_cache.popitem(last=False)
+    return result
+
+def build_2d_tracks(primary, simulated, conflicts):
+    """Time-sorted per-drone (t, x, y) arrays for the frontend's 2D player; t is epoch seconds."""
+    def sorted_track(waypoints):
+        x, y, _, t = _to_arrays(waypoints)
+        order = np.argsort(t, kind='stable')
+        return {"t": t[order], "x": x[order], "y": y[order]}
 
-def create_2d_animation(primary, simulated, conflicts):
-    """Create 2D matplotlib animation and return path to saved file"""
-    # Sort all unique timestamps
-    all_times = sorted({
-        *(parse_time_cached(wp['time']) for wp in primary['waypoints']),
-        *(parse_time_cached(wp['time']) for drone in simulated for wp in drone['waypoints']),
-        *(parse_time_cached(conflict['time']) for conflict in conflicts)
-    })
-
-    # Color and marker maps
-    color_map = {'primary': 'blue'}
-    marker_map = {'primary': 'x'}
-    palette = ['orange', 'green', 'purple', 'brown', 'cyan', 'magenta', 'olive', 'teal']
-    marker_styles = ['o', 's', '^', 'D', 'v', 'P', '*', 'H']
-
-    for i, drone in enumerate(simulated):
-        color_map[drone['id']] = palette[i % len(palette)]
-        marker_map[drone['id']] = marker_styles[i % len(marker_styles)]
-
-    def filter_xy(waypoints, up_to_time):
-        filtered = [wp for wp in waypoints if parse_time_cached(wp['time']) <= up_to_time]
-        return [wp['x'] for wp in filtered], [wp['y'] for wp in filtered]
-
-    fig, ax = plt.subplots(figsize=(10, 8))
-
-    def update(frame_idx):
-        ax.clear()
-        current_time = all_times[frame_idx]
-        ax.set_title(f"Drone Trajectories at {current_time.strftime('%H:%M:%S')}")
-        ax.set_xlabel('X Position')
-        ax.set_ylabel('Y Position')
-        ax.grid(True)
-        ax.axis('equal')
-
-        # Plot primary drone
-        x, y = filter_xy(primary['waypoints'], current_time)
-        ax.plot(x, y, color=color_map['primary'], marker=marker_map['primary'], label='Primary Drone')
-
-        # Plot simulated drones
-        for drone in simulated:
-            dx, dy = filter_xy(drone['waypoints'], current_time)
-            ax.plot(dx, dy, linestyle='--', color=color_map[drone['id']], marker=marker_map[drone['id']], label=f"Sim {drone['id']}")
-
-        # Plot current conflicts
-        for c in conflicts:
-            if is_time_close(parse_time_cached(c['time']), current_time):
-                cid = c['conflict_with']
-                color = color_map.get(cid, 'red')
-                marker = marker_map.get(cid, 'x')
-                ax.scatter(c['location']['x'], c['location']['y'], color=color, s=510, marker=marker, label=f"Conflict with {cid}")
-
-        ax.legend(loc='upper right')
-
-    # Create animation and save as HTML
-    anim = FuncAnimation(fig, update, frames=len(all_times), interval=200, repeat=False)
-    
-    # Save as HTML file
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.html')
-    with open(temp_file.name, 'w') as f:
-        f.write(f"""
-        <!DOCTYPE html>
-        <html>
-        <head><title>2D Animation</title></head>
-        <body>
-            <h1>2D Drone Trajectory Animation</h1>
-            <p>Animation created with {len(all_times)} frames</p>
-            <p>Primary drone with {len(simulated)} simulated drones</p>
-            <p>Conflicts detected: {len(conflicts)}</p>
-        </body>
-        </html>
-        """)
-    
-    return temp_file.name
+    return {
+        "primary": sorted_track(primary['waypoints']),
+        "simulated": [{"id": drone['id'], **sorted_track(drone['waypoints'])} for drone in simulated],
+        "conflicts": {
+            "t": np.fromiter((ts(c['time']) for c in conflicts), dtype=np.float64, count=len(conflicts)),
+            "x": np.asarray([c['location']['x'] for c in conflicts], dtype=np.float64),
+            "y": np.asarray([c['location']['y'] for c in conflicts], dtype=np.float64),
+            "conflict_with": [c['conflict_with'] for c in conflicts]
+        }
+    }
 
 def create_4d_plot(primary, simulated, conflicts):
     """Create 4D plotly visualization and return HTML"""
-    all_times = sorted({
-        *(parse_time_cached(wp['time']) for wp in primary['waypoints']),
-        *(parse_time_cached(wp['time']) for drone in simulated for wp in drone['waypoints']),
-        *(parse_time_cached(conflict['time']) for conflict in conflicts)
-    })
-
     def extract_xyz(waypoints):
-        return zip(*[(wp['x'], wp['y'], wp['z']) for wp in waypoints])
+        x, y, z, _ = _to_arrays(waypoints)
+        return x.astype(np.float32), y.astype(np.float32), z.astype(np.float32)
 
     # Assign colors and symbols
     shape_map = {'primary': 'x'}
@@ -198,18 +392,17 @@ def create_4d_plot(primary, simulated, conflicts):
             marker=dict(size=4),
         ))
 
-    # Static marker for all conflicts
+    # Static markers for all conflicts, one trace per conflicting drone
     if conflicts:
-        for c in conflicts:
-            cid = c['conflict_with']
-            color = color_map.get(cid, 'red')
-            shape = shape_map.get(cid, 'x')
+        conflict_ids = np.asarray([c['conflict_with'] for c in conflicts], dtype=object)
+        cxyz = np.asarray([(c['location']['x'], c['location']['y'], c['location']['z']) for c in conflicts],
+                          dtype=np.float32)
+        for cid in dict.fromkeys(conflict_ids):
+            pts = cxyz[conflict_ids == cid]
             fig.add_trace(go.Scatter3d(
-                x=[c['location']['x']],
-                y=[c['location']['y']],
-                z=[c['location']['z']],
+                x=pts[:, 0], y=pts[:, 1], z=pts[:, 2],
                 mode='markers',
-                marker=dict(color=color, size=6, symbol=shape),
+                marker=dict(color=color_map.get(cid, 'red'), size=6, symbol=shape_map.get(cid, 'x')),
                 name=f"Conflict with {cid}"
             ))
 
@@ -219,7 +412,98 @@ def create_4d_plot(primary, simulated, conflicts):
         showlegend=True
     )
 
-    return fig.to_html()
+    # Load plotly.js from the CDN instead of inlining the ~3 MB bundle
+    return fig.to_html(include_plotlyjs='cdn')
+
+# 4D plots render in a process pool so request threads never block on plotly.
+# Finished jobs stay pollable for _RENDER_JOB_TTL seconds, and at most
+# _MAX_FINISHED_RENDER_JOBS are kept, so closed windows can't leak results.
+_RENDER_JOB_TTL = 300
+_MAX_FINISHED_RENDER_JOBS = 32
+_render_executor = None
+_render_jobs = OrderedDict()  # job id -> [simulation id, Future, finish time or None]
+_sim_render_jobs = {}  # simulation id -> job id of its in-flight or recently finished render
+_render_lock = threading.Lock()
+
+def _get_render_executor():
+    """Create the pool on first use; 'spawn' avoids forking a multithreaded worker."""
+    global _render_executor
+    if _render_executor is None:
+        _render_executor = ProcessPoolExecutor(max_workers=os.cpu_count(),
+                                               mp_context=multiprocessing.get_context('spawn'))
+    return _render_executor
+
+def _prune_render_jobs():
+    """Drop expired finished jobs, then the oldest finished ones past the cap. Caller holds _render_lock."""
+    now = time.monotonic()
+    finished = [job_id for job_id, (_, _, done_at) in _render_jobs.items() if done_at is not None]
+    excess = len(finished) - _MAX_FINISHED_RENDER_JOBS
+    for i, job_id in enumerate(finished):
+        simulation_id, _, done_at = _render_jobs[job_id]
+        if i < excess or now - done_at > _RENDER_JOB_TTL:
+            del _render_jobs[job_id]
+            if _sim_render_jobs.get(simulation_id) == job_id:
+                del _sim_render_jobs[simulation_id]
+
+def submit_4d_render(simulation_id, simulation):
+    """Queue create_4d_plot for a simulation and return the job id; reuses a live job for it."""
+    with _render_lock:
+        _prune_render_jobs()
+        job_id = _sim_render_jobs.get(simulation_id)
+        if job_id is not None:
+            return job_id
+
+        job_id = uuid.uuid4().hex
+        executor = _get_render_executor()
+        future = executor.submit(
+            create_4d_plot,
+            simulation["primary_mission"],
+            simulation["simulated_flights"],
+            simulation["conflicts"]
+        )
+        _render_jobs[job_id] = [simulation_id, future, None]
+        _sim_render_jobs[simulation_id] = job_id
+
+    def on_done(fut):
+        global _render_executor
+        with _render_lock:
+            job = _render_jobs.get(job_id)
+            if job is not None:
+                job[2] = time.monotonic()
+            if fut.exception() is not None:
+                # Let the next visit retry instead of reusing the failed job
+                if _sim_render_jobs.get(simulation_id) == job_id:
+                    del _sim_render_jobs[simulation_id]
+                # A crashed pool rejects every later submit; start a fresh one next time
+                if isinstance(fut.exception(), BrokenProcessPool) and _render_executor is executor:
+                    _render_executor = None
+            elif simulation_id in _sim_by_id:
+                # Only cache pages for simulations still held in memory
+                _plot_4d_html[simulation_id] = fut.result()
+
+    future.add_done_callback(on_done)
+    return job_id
+
+# Served with 202 while a 4D plot renders; polls /api/job/<id> and swaps in the result
+PENDING_4D_HTML = """<!DOCTYPE html>
+<html>
+<head><title>4D Visualization</title></head>
+<body>
+<p id="status">Rendering 4D visualization...</p>
+<script>
+const url = '/api/job/__JOB_ID__';
+function poll() {
+  fetch(url).then(r => {
+    if (r.status === 202) { setTimeout(poll, 500); return; }
+    if (!r.ok) return r.json().then(res => { throw new Error(res.message); });
+    return r.text().then(html => { document.open(); document.write(html); document.close(); });
+  }).catch(err => { document.getElementById('status').textContent = 'Error: ' + err.message; });
+}
+poll();
+</script>
+</body>
+</html>
+"""
 
 def generate_sample_data():
     """Generate sample mission and flight data"""
@@ -255,16 +539,16 @@ def generate_sample_data_endpoint():
     """Generate sample mission and flight data"""
     try:
         sample_data = generate_sample_data()
-        return jsonify({
+        return ojsonify({
             "status": "success",
             "data": sample_data,
             "message": "Sample data generated successfully"
         })
     except Exception as e:
-        return jsonify({
+        return ojsonify({
             "status": "error",
             "message": str(e)
-        }), 500
+        }, 500)
 
 @app.route('/api/run-deconfliction', methods=['POST'])
 def run_deconfliction():
@@ -277,17 +561,17 @@ def run_deconfliction():
         time_tolerance = data.get('time_tolerance', 1)
         
         if not primary_mission or not simulated_flights:
-            return jsonify({
+            return ojsonify({
                 "status": "error",
                 "message": "Missing primary_mission or simulated_flights data"
-            }), 400
+            }, 400)
         
         # Run conflict detection using your function
-        status, conflicts = check_mission(primary_mission, simulated_flights, distance_threshold)
+        status, conflicts = check_mission_cached(primary_mission, simulated_flights, distance_threshold)
         
         # Store results
         simulation_result = {
-            "id": str(len(simulation_results) + 1),
+            "id": str(next(_sim_ids)),
             "name": f"Mission {primary_mission.get('mission_id', 'Unknown')}",
             "timestamp": datetime.now().isoformat(),
             "primary_mission": primary_mission,
@@ -302,9 +586,9 @@ def run_deconfliction():
             }
         }
         
-        simulation_results.append(simulation_result)
+        store_simulation(simulation_result)
         
-        return jsonify({
+        return ojsonify({
             "status": "success",
             "mission_status": status,
             "conflicts_found": simulation_result["conflicts_found"],
@@ -314,62 +598,101 @@ def run_deconfliction():
         })
         
     except Exception as e:
-        return jsonify({
+        return ojsonify({
             "status": "error",
             "message": str(e)
-        }), 500
+        }, 500)
 
-@app.route('/api/visualize-2d/<simulation_id>', methods=['GET'])
-def visualize_2d(simulation_id):
-    """Generate 2D matplotlib animation"""
+@app.route('/api/visualize-2d/<simulation_id>/data', methods=['GET'])
+def visualize_2d_data(simulation_id):
+    """Get the per-drone tracks rendered by the frontend's 2D player"""
     try:
-        simulation = next((s for s in simulation_results if s["id"] == simulation_id), None)
+        simulation = get_simulation(simulation_id)
         if not simulation:
-            return jsonify({"status": "error", "message": "Simulation not found"}), 404
+            return ojsonify({"status": "error", "message": "Simulation not found"}, 404)
         
-        animation_path = create_2d_animation(
+        tracks = build_2d_tracks(
             simulation["primary_mission"], 
             simulation["simulated_flights"],
             simulation["conflicts"]
         )
         
-        return send_file(animation_path, as_attachment=True)
+        return ojsonify({
+            "status": "success",
+            "tracks": tracks
+        })
         
     except Exception as e:
-        return jsonify({
+        return ojsonify({
             "status": "error",
             "message": str(e)
-        }), 500
+        }, 500)
 
 @app.route('/api/visualize-4d/<simulation_id>', methods=['GET'])
 def visualize_4d(simulation_id):
-    """Generate 4D plotly visualization"""
+    """Serve the 4D plotly visualization, rendering it in the background if needed"""
     try:
-        simulation = next((s for s in simulation_results if s["id"] == simulation_id), None)
+        simulation = get_simulation(simulation_id)
         if not simulation:
-            return jsonify({"status": "error", "message": "Simulation not found"}), 404
+            return ojsonify({"status": "error", "message": "Simulation not found"}, 404)
         
-        plot_html = create_4d_plot(
-            simulation["primary_mission"], 
-            simulation["simulated_flights"],
-            simulation["conflicts"]
-        )
+        plot_html = _plot_4d_html.get(simulation_id)
+        if plot_html is not None:
+            return plot_html, 200, {'Content-Type': 'text/html'}
         
-        return plot_html, 200, {'Content-Type': 'text/html'}
+        job_id = submit_4d_render(simulation_id, simulation)
+        return PENDING_4D_HTML.replace('__JOB_ID__', job_id), 202, {
+            'Content-Type': 'text/html',
+            'Location': f'/api/job/{job_id}'
+        }
         
     except Exception as e:
-        return jsonify({
+        return ojsonify({
             "status": "error",
             "message": str(e)
-        }), 500
+        }, 500)
+
+@app.route('/api/job/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Poll a background render job; returns its HTML once finished"""
+    try:
+        with _render_lock:
+            _prune_render_jobs()
+            job = _render_jobs.get(job_id)
+        if job is None:
+            return ojsonify({"status": "error", "message": "Job not found"}, 404)
+        
+        # Finished jobs stay until they expire, so every window sharing one gets the page
+        _, future, _ = job
+        if not future.done():
+            return ojsonify({"status": "pending", "job_id": job_id}, 202)
+        
+        return future.result(), 200, {'Content-Type': 'text/html'}
+        
+    except Exception as e:
+        return ojsonify({
+            "status": "error",
+            "message": str(e)
+        }, 500)
 
 @app.route('/api/simulations', methods=['GET'])
 def get_simulations():
     """Get list of all simulation results"""
-    try:
-        simplified_results = []
-        for sim in simulation_results:
-            simplified_results.append({
+    # Snapshot so concurrent stores can't mutate the deque mid-stream
+    with _results_lock:
+        sims = list(simulation_results)
+
+    # The body is encoded after this view returns, so a failure part-way could
+    # not become an error response anyway; rows hold only plain str/int/bool.
+    def generate():
+        # Stream one record at a time instead of building the whole list
+        yield b'{"status":"success","simulations":['
+        first = True
+        for sim in sims:
+            if not first:
+                yield b','
+            first = False
+            yield json_bytes({
                 "id": sim["id"],
                 "name": sim["name"],
                 "timestamp": sim["timestamp"],
@@ -378,54 +701,55 @@ def get_simulations():
                 "flight_count": len(sim["simulated_flights"]) + 1,
                 "status": "completed"
             })
-        
-        return jsonify({
-            "status": "success",
-            "simulations": simplified_results
-        })
-        
-    except Exception as e:
-        return jsonify({
-            "status": "error",
-            "message": str(e)
-        }), 500
+        yield b']}'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
 
 @app.route('/api/simulation/<simulation_id>', methods=['GET'])
 def get_simulation_details(simulation_id):
     """Get detailed results for a specific simulation"""
     try:
-        simulation = next((s for s in simulation_results if s["id"] == simulation_id), None)
+        simulation = get_simulation(simulation_id)
         if not simulation:
-            return jsonify({"status": "error", "message": "Simulation not found"}), 404
+            return ojsonify({"status": "error", "message": "Simulation not found"}, 404)
+        
+        # Unchanged since the client's last poll: skip the body entirely
+        etag = _sim_etags.get(simulation_id) or simulation_etag(simulation)
+        if request.if_none_match.contains_weak(etag):
+            resp = Response(status=304)
+            resp.set_etag(etag)
+            return resp
         
-        return jsonify({
+        resp = ojsonify({
             "status": "success",
             "simulation": simulation
         })
+        resp.set_etag(etag)
+        return resp
         
     except Exception as e:
-        return jsonify({
+        return ojsonify({
             "status": "error",
             "message": str(e)
-        }), 500
+        }, 500)
 
 @app.route('/api/resimulate/<simulation_id>', methods=['POST'])
 def resimulate(simulation_id):
     """Resimulate an existing scenario"""
     try:
-        original = next((s for s in simulation_results if s["id"] == simulation_id), None)
+        original = get_simulation(simulation_id)
         if not original:
-            return jsonify({"status": "error", "message": "Original simulation not found"}), 404
+            return ojsonify({"status": "error", "message": "Original simulation not found"}, 404)
         
         # Rerun the analysis with the same data
-        status, conflicts = check_mission(
+        status, conflicts = check_mission_cached(
             original["primary_mission"], 
             original["simulated_flights"],
             original["parameters"]["distance_threshold"]
         )
         
         simulation_result = {
-            "id": str(len(simulation_results) + 1),
+            "id": str(next(_sim_ids)),
             "name": f"Resim {original['primary_mission'].get('mission_id', 'Unknown')}",
             "timestamp": datetime.now().isoformat(),
             "primary_mission": original["primary_mission"],
@@ -437,9 +761,9 @@ def resimulate(simulation_id):
             "parameters": original["parameters"]
         }
         
-        simulation_results.append(simulation_result)
+        store_simulation(simulation_result)
         
-        return jsonify({
+        return ojsonify({
             "status": "success",
             "mission_status": status,
             "conflicts_found": simulation_result["conflicts_found"],
@@ -448,13 +772,14 @@ def resimulate(simulation_id):
         })
         
     except Exception as e:
-        return jsonify({
+        return ojsonify({
             "status": "error",
             "message": str(e)
-        }), 500
+        }, 500)
 
 if __name__ == '__main__':
     print("Starting UAV Deconfliction Flask Backend...")
     print("Make sure your frontend is running on http://localhost:3000")
     print("Backend will be available at http://localhost:5000")
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    print("For anything beyond local development use: gunicorn -c gunicorn.conf.py wsgi:app")
+    app.run(host='0.0.0.0', port=5000)
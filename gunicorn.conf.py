@@ -0,0 +1,18 @@
+"""
+Gunicorn settings for the UAV Deconfliction backend.
+Override any value with the matching GUNICORN_* environment variable.
+"""
+
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+# Simulation results are kept in process memory, so every worker has its own
+# history. Keep a single worker unless results move to shared storage, and
+# scale with threads instead: the NumPy/Numba conflict checks release the GIL.
+workers = int(os.environ.get('GUNICORN_WORKERS', '1'))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+
+# Plot generation for large missions can take a while
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '120'))
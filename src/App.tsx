@@ -9,6 +9,7 @@ import Index from "./pages/Index";
 import DataGeneration from "./pages/DataGeneration";
 import SimulationHistory from "./pages/SimulationHistory";
 import ConflictAnalysis from "./pages/ConflictAnalysis";
+import Visualization2D from "./pages/Visualization2D";
 import NotFound from "./pages/NotFound";
 
 const queryClient = new QueryClient();
@@ -26,6 +27,7 @@ const App = () => (
             <Route path="/data-generation" element={<DataGeneration />} />
             <Route path="/simulation-history" element={<SimulationHistory />} />
             <Route path="/conflict-analysis" element={<ConflictAnalysis />} />
+            <Route path="/visualize-2d/:simulationId" element={<Visualization2D />} />
             {/* ADD ALL CUSTOM ROUTES ABOVE THE CATCH-ALL "*" ROUTE */}
             <Route path="*" element={<NotFound />} />
           </Routes>
@@ -85,7 +85,7 @@ const ConflictAnalysis = () => {
   const view2DVisualization = () => {
     if (!selectedSimulation) return;
     setVisualizationLoading(true);
-    const url = `/api/visualize-2d/${selectedSimulation.id}`;
+    const url = `/visualize-2d/${selectedSimulation.id}`;
     const newWindow = window.open(url, '_blank', 'width=1000,height=800');
     if (newWindow) {
       newWindow.onload = () => setVisualizationLoading(false);
@@ -293,7 +293,7 @@ const ConflictAnalysis = () => {
                   <Card>
                     <CardHeader>
                       <CardTitle className="flex items-center justify-between">
-                        2D Mission Visualization (Matplotlib)
+                        2D Mission Visualization
                         <Button 
                           onClick={view2DVisualization}
                           disabled={visualizationLoading}
@@ -310,7 +310,7 @@ const ConflictAnalysis = () => {
                           2D trajectory animation with conflict visualization
                         </div>
                         <div className="text-sm text-gray-500">
-                          Click "Open 2D View" to launch the matplotlib animation in a new window
+                          Click "Open 2D View" to open the 2D trajectory player in a new window
                         </div>
                         <div className="mt-4 text-xs text-gray-400">
                           • Primary drone trajectory in blue
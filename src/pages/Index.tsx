@@ -57,7 +57,7 @@ const Index = () => {
               </CardHeader>
               <CardContent>
                 <p className="text-gray-600 mb-4">
-                  View detailed conflict analysis with matplotlib and plotly visualizations.
+                  View detailed conflict analysis with an interactive 2D player and plotly 4D visualizations.
                 </p>
                 <Link to="/conflict-analysis">
                   <Button className="w-full">
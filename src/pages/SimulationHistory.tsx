@@ -113,7 +113,7 @@ const SimulationHistory = () => {
   };
 
   const view2DAnimation = (simulation: SimulationRun) => {
-    const url = `/api/visualize-2d/${simulation.id}`;
+    const url = `/visualize-2d/${simulation.id}`;
     window.open(url, '_blank');
   };
 
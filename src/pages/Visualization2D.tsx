@@ -0,0 +1,191 @@
+
+import React, { useState, useEffect, useMemo, useRef } from 'react';
+import { useParams } from 'react-router-dom';
+import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
+import { Button } from '@/components/ui/button';
+import { RefreshCw, RotateCcw } from 'lucide-react';
+
+interface Track {
+  t: number[];
+  x: number[];
+  y: number[];
+}
+
+interface DroneTrack extends Track {
+  id: string;
+}
+
+interface TrackData {
+  primary: Track;
+  simulated: DroneTrack[];
+  conflicts: Track & { conflict_with: string[] };
+}
+
+interface Series extends Track {
+  label: string;
+  color: string;
+  dashed: boolean;
+}
+
+const PALETTE = ['orange', 'green', 'purple', 'brown', 'cyan', 'magenta', 'olive', 'teal'];
+const FRAME_INTERVAL_MS = 200;
+const CONFLICT_WINDOW_S = 0.5;
+const CANVAS_WIDTH = 900;
+const CANVAS_HEIGHT = 700;
+
+// Plain loops: spreading large tracks into Math.min/max overflows the call stack
+const extent = (arrays: number[][]) => {
+  let lo = Infinity;
+  let hi = -Infinity;
+  for (const values of arrays) {
+    for (const v of values) {
+      if (v < lo) lo = v;
+      if (v > hi) hi = v;
+    }
+  }
+  return [lo, hi];
+};
+
+const Visualization2D = () => {
+  const { simulationId } = useParams();
+  const canvasRef = useRef<HTMLCanvasElement>(null);
+  const [tracks, setTracks] = useState<TrackData | null>(null);
+  const [error, setError] = useState<string | null>(null);
+  const [frame, setFrame] = useState(0);
+
+  useEffect(() => {
+    const fetchTracks = async () => {
+      try {
+        const response = await fetch(`/api/visualize-2d/${simulationId}/data`);
+        const data = await response.json();
+        if (data.status !== 'success') {
+          throw new Error(data.message);
+        }
+        setTracks(data.tracks);
+        setFrame(0);
+      } catch (err) {
+        console.error('Error fetching tracks:', err);
+        setError(err instanceof Error ? err.message : 'Failed to fetch track data');
+      }
+    };
+    fetchTracks();
+  }, [simulationId]);
+
+  const { series, colorOf, frames } = useMemo(() => {
+    if (!tracks) return { series: [] as Series[], colorOf: {} as Record<string, string>, frames: [] as number[] };
+
+    const colorOf: Record<string, string> = {};
+    const series: Series[] = [{ label: 'Primary Drone', color: 'blue', dashed: false, ...tracks.primary }];
+    tracks.simulated.forEach((drone, i) => {
+      colorOf[drone.id] = PALETTE[i % PALETTE.length];
+      series.push({ label: `Sim ${drone.id}`, color: colorOf[drone.id], dashed: true, ...drone });
+    });
+
+    // Every unique timestamp is one frame
+    const unique = new Set<number>(tracks.conflicts.t);
+    for (const s of series) {
+      for (const t of s.t) unique.add(t);
+    }
+    const frames = Array.from(unique).sort((a, b) => a - b);
+    return { series, colorOf, frames };
+  }, [tracks]);
+
+  // Fixed, square view over every track so the axes never move between frames
+  const view = useMemo(() => {
+    if (!tracks) return null;
+    const [xMin, xMax] = extent([...series.map((s) => s.x), tracks.conflicts.x]);
+    const [yMin, yMax] = extent([...series.map((s) => s.y), tracks.conflicts.y]);
+    const half = Math.max(xMax - xMin, yMax - yMin, 1) * 0.55;
+    return {
+      cx: (xMin + xMax) / 2,
+      cy: (yMin + yMax) / 2,
+      scale: Math.min(CANVAS_WIDTH, CANVAS_HEIGHT) / (2 * half),
+    };
+  }, [tracks, series]);
+
+  useEffect(() => {
+    if (frame >= frames.length - 1) return;
+    const timer = setTimeout(() => setFrame(frame + 1), FRAME_INTERVAL_MS);
+    return () => clearTimeout(timer);
+  }, [frame, frames]);
+
+  useEffect(() => {
+    const ctx = canvasRef.current?.getContext('2d');
+    if (!ctx || !tracks || !view || frames.length === 0) return;
+
+    const now = frames[frame];
+    const px = (x: number) => CANVAS_WIDTH / 2 + (x - view.cx) * view.scale;
+    const py = (y: number) => CANVAS_HEIGHT / 2 - (y - view.cy) * view.scale;
+    ctx.clearRect(0, 0, CANVAS_WIDTH, CANVAS_HEIGHT);
+
+    // Tracks are time-sorted, so each one is drawn up to its first future point
+    for (const s of series) {
+      ctx.strokeStyle = s.color;
+      ctx.fillStyle = s.color;
+      ctx.setLineDash(s.dashed ? [6, 4] : []);
+      ctx.beginPath();
+      for (let i = 0; i < s.t.length && s.t[i] <= now; i++) {
+        if (i === 0) ctx.moveTo(px(s.x[i]), py(s.y[i]));
+        else ctx.lineTo(px(s.x[i]), py(s.y[i]));
+      }
+      ctx.stroke();
+      for (let i = 0; i < s.t.length && s.t[i] <= now; i++) {
+        ctx.fillRect(px(s.x[i]) - 3, py(s.y[i]) - 3, 6, 6);
+      }
+    }
+
+    const conflicts = tracks.conflicts;
+    ctx.setLineDash([]);
+    for (let i = 0; i < conflicts.t.length; i++) {
+      if (Math.abs(conflicts.t[i] - now) > CONFLICT_WINDOW_S) continue;
+      ctx.fillStyle = colorOf[conflicts.conflict_with[i]] || 'red';
+      ctx.beginPath();
+      ctx.arc(px(conflicts.x[i]), py(conflicts.y[i]), 12, 0, 2 * Math.PI);
+      ctx.fill();
+    }
+
+    // Timestamps are epoch seconds of naive (UTC) mission times
+    ctx.fillStyle = 'black';
+    ctx.font = '14px sans-serif';
+    ctx.fillText(new Date(now * 1000).toISOString().substring(11, 19), 10, 20);
+    series.forEach((s, i) => {
+      ctx.fillStyle = s.color;
+      ctx.fillText(s.label, CANVAS_WIDTH - 180, 20 + 18 * i);
+    });
+  }, [frame, frames, series, colorOf, tracks, view]);
+
+  return (
+    <div className="min-h-screen bg-gray-50 p-6">
+      <div className="max-w-6xl mx-auto">
+        <div className="mb-6">
+          <h1 className="text-3xl font-bold text-gray-900">2D Drone Trajectory Animation</h1>
+          <p className="text-gray-600 mt-2">Simulation {simulationId}</p>
+        </div>
+
+        <Card>
+          <CardHeader>
+            <CardTitle className="flex items-center justify-between">
+              {error
+                ? `Error: ${error}`
+                : tracks
+                  ? `${frames.length} frames, ${tracks.simulated.length} simulated drones, ${tracks.conflicts.t.length} conflicts`
+                  : 'Loading...'}
+              <Button onClick={() => setFrame(0)} variant="outline" size="sm" disabled={!tracks}>
+                {tracks ? <RotateCcw className="h-4 w-4" /> : <RefreshCw className="h-4 w-4 animate-spin" />}
+              </Button>
+            </CardTitle>
+          </CardHeader>
+          <CardContent>
+            {tracks && frames.length === 0 ? (
+              <div className="text-center text-gray-500 py-8">Nothing to animate</div>
+            ) : (
+              <canvas ref={canvasRef} width={CANVAS_WIDTH} height={CANVAS_HEIGHT} className="border border-gray-200" />
+            )}
+          </CardContent>
+        </Card>
+      </div>
+    </div>
+  );
+};
+
+export default Visualization2D;
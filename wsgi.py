@@ -0,0 +1,9 @@
+"""
+WSGI entrypoint for the UAV Deconfliction backend.
+Run with: gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+from flask_backend import app
+
+if __name__ == '__main__':
+    app.run(host='0.0.0.0', port=5000)